@@ -4,9 +4,131 @@
 Convert ASC font files to JavaScript format
 """
 import os
+import sys
+import base64
 import struct
 
-def convert_asc_to_js(font_file, height, width, output_file):
+# Lookup tables for formatting a byte value
+_HEX_TABLE = [f'0x{b:02x}' for b in range(256)]
+_BITS_TABLE = [format(b, '08b') for b in range(256)]
+
+def column_major_to_row_major(data, num_chars, bytes_per_char, width, height):
+    """
+    Reorder column-major character bitmaps to row-major display format
+    
+    In column-major order bit (row i, column j) sits at index j * height + i.
+    When height is a multiple of 8 each column byte holds 8 rows, so the
+    characters are walked one column byte at a time: the same byte of every
+    column is unpacked through the lookup table and each of its 8 rows is one
+    strided slice. Other heights fall back to slicing a bit string of the
+    whole file with stride height.
+    
+    Args:
+        data: Raw font data (column-major)
+        num_chars: Number of characters in data
+        bytes_per_char: Bytes per character in data
+        width: Font width in pixels
+        height: Font height in pixels
+    
+    Returns:
+        List of row-major character bitmaps (bytes)
+    """
+    bytes_per_row = (width + 7) // 8
+    bytes_per_char_display = bytes_per_row * height
+    row_padding = '0' * (bytes_per_row * 8 - width)
+    
+    result = []
+    
+    if height % 8 == 0:
+        bytes_per_column = height // 8
+        column_size = width * bytes_per_column
+        
+        for char_index in range(num_chars):
+            start = char_index * bytes_per_char
+            char_data = data[start:start + bytes_per_char].ljust(column_size, b'\x00')
+            
+            rows = []
+            for col_byte in range(bytes_per_column):
+                # Byte col_byte of every column, 8 bits per column
+                block = "".join(map(_BITS_TABLE.__getitem__,
+                                    char_data[col_byte:column_size:bytes_per_column]))
+                rows.extend(block[bit::8] + row_padding for bit in range(8))
+            result.append(int(''.join(rows), 2).to_bytes(bytes_per_char_display, 'big'))
+        
+        return result
+    
+    bits_per_char = max(bytes_per_char * 8, width * height)
+    
+    # Unpack all characters to '0'/'1' in one C-level call
+    data = data[:num_chars * bytes_per_char]
+    bits = bin(int.from_bytes(data, 'big'))[2:].zfill(len(data) * 8) if data else ''
+    
+    for char_index in range(num_chars):
+        start = char_index * bytes_per_char * 8
+        char_bits = bits[start:start + bytes_per_char * 8].ljust(bits_per_char, '0')
+        
+        # Row i is every height-th bit starting at i
+        rows = [char_bits[i:width * height:height] + row_padding for i in range(height)]
+        result.append(int(''.join(rows), 2).to_bytes(bytes_per_char_display, 'big'))
+    
+    return result
+
+
+def split_row_major(data, num_chars, bytes_per_char):
+    """
+    Split row-major font data into per-character bitmaps
+    
+    Args:
+        data: Raw font data (row-major)
+        num_chars: Number of characters in data
+        bytes_per_char: Bytes per character in data
+    
+    Returns:
+        List of character bitmaps (bytes)
+    """
+    return [data[i * bytes_per_char:(i + 1) * bytes_per_char] for i in range(num_chars)]
+
+
+def emit_font_data(font_chars, bytes_per_row):
+    """
+    Format character bitmaps as JavaScript array lines
+    
+    Args:
+        font_chars: Row-major bitmaps indexed by ASCII code
+        bytes_per_row: Bytes per bitmap row
+    
+    Returns:
+        List of JavaScript source lines
+    """
+    js_data = []
+    
+    for ascii_code, char_data in enumerate(font_chars):
+        # Add comment with character info
+        if ascii_code < 32:
+            char_name = f'^{chr(ascii_code + 64)}'
+        elif ascii_code == 0x7f:
+            char_name = '.'
+        else:
+            char_name = chr(ascii_code)
+        
+        js_data.append(f'    /* {ascii_code} 0x{ascii_code:02x} \'{char_name}\' */')
+        
+        # Group by width (format output for readability)
+        for i in range(0, len(char_data), bytes_per_row):
+            line_bytes = char_data[i:i + bytes_per_row]
+            line_hex = ", ".join(map(_HEX_TABLE.__getitem__, line_bytes))
+            
+            # Decode bits for visualization
+            bits_str = "".join(map(_BITS_TABLE.__getitem__, line_bytes))
+            
+            js_data.append(f'    {line_hex}, /* {bits_str} */')
+        
+        js_data.append("")  # Empty line between characters
+    
+    return js_data
+
+
+def convert_asc_to_js(font_file, height, width, output_file, verbose=False):
     """
     Convert ASC font file to JavaScript format
     
@@ -15,6 +137,8 @@ def convert_asc_to_js(font_file, height, width, output_file):
         height: Font height in pixels
         width: Font width in pixels
         output_file: Output JavaScript file path
+        verbose: Emit a commented hex array (one line per bitmap row) instead
+                 of a compact base64-encoded Uint8Array
     """
     
     # Read the binary file
@@ -33,113 +157,57 @@ def convert_asc_to_js(font_file, height, width, output_file):
     # Total number of printable characters in file (ASCII 32-126)
     total_printable_chars = 95
     
-    # Array to store converted data
-    js_data = []
-    
     # Determine if column-major or row-major based on height
     # According to Num2Mat.java: height==12 or height==48 use row-major, else use column-major
     is_column_major = not (height == 12 or height == 48)
     
-    # Process all 128 ASCII characters (0x00-0x7f)
-    for ascii_code in range(128):
-        # Determine if this is a printable character
-        is_printable = 32 <= ascii_code < 127
-        
-        # Get character data
-        if is_printable:
-            # Calculate offset in bytes (only printable chars are in the file)
-            file_char_index = ascii_code - 32
-            offset = file_char_index * file_bytes_per_char
-            
-            # Get character data from file
-            char_data = data[offset:offset + file_bytes_per_char]
-        else:
-            # Use all zeros for non-printable characters  
-            char_data = bytes([0] * file_bytes_per_char)
-        
-        # Convert column-major to row-major if needed
-        # For column-major: data is stored column by column
-        # For row-major: data is stored row by row
-        if is_column_major:
-            # Convert column-major to row-major for display
-            # Each bit represents: column j, row i at index = j * height + i
-            # We need to reorder to: row i, column j at index = i * width + j
-            reordered_data = bytearray([0] * bytes_per_char_display)
-            
-            for i in range(height):  # row
-                for j in range(width):  # column
-                    # Calculate bit position in column-major format
-                    bit_index = j * height + i
-                    
-                    # Get byte and bit in source data
-                    source_byte_idx = bit_index // 8
-                    source_bit_idx = bit_index % 8
-                    
-                    # Get the bit value
-                    source_byte = char_data[source_byte_idx] if source_byte_idx < len(char_data) else 0
-                    bit_value = (source_byte >> (7 - source_bit_idx)) & 1
-                    
-                    # Calculate position in row-major format
-                    dest_bit_index = i * width + j
-                    dest_byte_idx = dest_bit_index // 8
-                    dest_bit_idx = dest_bit_index % 8
-                    
-                    # Set the bit in destination
-                    if bit_value:
-                        reordered_data[dest_byte_idx] |= (1 << (7 - dest_bit_idx))
-            
-            char_data = bytes(reordered_data)
-        
-        # Convert to hex array
-        hex_array = []
-        
-        # Process bytes
-        for byte_val in char_data:
-            hex_array.append(f'0x{byte_val:02x}')
-        
-        # Add comment with character info
-        if ascii_code < 32:
-            char_name = f'^{chr(ascii_code + 64)}'
-        elif ascii_code == 0x7f:
-            char_name = '.'
-        else:
-            char_name = chr(ascii_code)
-        
-        js_data.append(f'    /* {ascii_code} 0x{ascii_code:02x} \'{char_name}\' */')
-        
-        # Group by width (format output for readability)
-        bytes_per_line = bytes_per_row
-        
-        for i in range(0, len(hex_array), bytes_per_line):
-            line_hex = ", ".join(hex_array[i:i + bytes_per_line])
-            
-            # Decode bits for visualization
-            bits_str = ""
-            for j in range(i, min(i + bytes_per_line, len(hex_array))):
-                byte_val = int(hex_array[j], 16)
-                for k in range(7, -1, -1):
-                    bits_str += "1" if (byte_val >> k) & 1 else "0"
-            
-            js_data.append(f'    {line_hex}, /* {bits_str} */')
-        
-        js_data.append("")  # Empty line between characters
+    # Get row-major data for all printable characters at once
+    # For column-major: data is stored column by column
+    # For row-major: data is stored row by row
+    if is_column_major:
+        printable_chars = column_major_to_row_major(
+            data, total_printable_chars, file_bytes_per_char, width, height)
+        char_size = bytes_per_char_display
+    else:
+        printable_chars = split_row_major(data, total_printable_chars, file_bytes_per_char)
+        char_size = file_bytes_per_char
+    
+    # All 128 ASCII characters (0x00-0x7f), only printable chars are in the file
+    # Use all zeros for non-printable characters
+    blank_char = bytes(char_size)
+    font_chars = [blank_char] * 32 + printable_chars + [blank_char]
+    
+    # Build the whole JavaScript file, then write it in one call
+    header = [
+        f'const font_{width}x{height} = {{',
+        f'    width: {width},',
+        f'    height: {height},',
+        f'    bytesPerChar: {bytes_per_char_display},  // Each character uses {bytes_per_char_display} bytes ({width}x{height} bitmap, {bytes_per_row} byte(s) per row)',
+    ]
+    footer = [
+        f'  }};',
+        f'',
+        f'// Export font data to global scope',
+        f'window.font_{width}x{height} = font_{width}x{height};',
+    ]
+    
+    if verbose:
+        data_lines = [
+            f'    data: [',
+            f'    // Contains 128 characters (0x00-0x7f), non-printable chars set to 0',
+        ] + emit_font_data(font_chars, bytes_per_row) + [
+            f'    ]',
+        ]
+    else:
+        # Decoded once by the browser, far smaller than a commented array
+        font_b64 = base64.b64encode(b''.join(font_chars)).decode('ascii')
+        data_lines = [
+            f'    // Contains 128 characters (0x00-0x7f), non-printable chars set to 0',
+            f'    data: Uint8Array.from(atob("{font_b64}"), c => c.charCodeAt(0))',
+        ]
     
-    # Write JavaScript file
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(f'const font_{width}x{height} = {{\n')
-        f.write(f'    width: {width},\n')
-        f.write(f'    height: {height},\n')
-        f.write(f'    bytesPerChar: {bytes_per_char_display},  // Each character uses {bytes_per_char_display} bytes ({width}x{height} bitmap, {bytes_per_row} byte(s) per row)\n')
-        f.write(f'    data: [\n')
-        f.write(f'    // Contains 128 characters (0x00-0x7f), non-printable chars set to 0\n')
-        
-        for line in js_data:
-            f.write(line + '\n')
-        
-        f.write(f'    ]\n')
-        f.write(f'  }};\n\n')
-        f.write(f'// Export font data to global scope\n')
-        f.write(f'window.font_{width}x{height} = font_{width}x{height};\n')
+        f.write("\n".join(header + data_lines + footer) + "\n")
     
     print(f"Converted {font_file} to {output_file}")
 
@@ -147,6 +215,9 @@ def convert_asc_to_js(font_file, height, width, output_file):
 def main():
     """Main function to convert all ASC font files"""
     
+    # --verbose: emit commented hex arrays for debugging
+    verbose = '--verbose' in sys.argv[1:]
+    
     base_dir = 'fonts/font_bin/ASC'
     
     # Define font specifications
@@ -163,7 +234,7 @@ def main():
         output_file = f'fonts/font_{width}x{height}.js'
         
         if os.path.exists(input_file):
-            convert_asc_to_js(input_file, height, width, output_file)
+            convert_asc_to_js(input_file, height, width, output_file, verbose)
         else:
             print(f"Warning: {input_file} not found")
 
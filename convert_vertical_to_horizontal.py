@@ -8,54 +8,146 @@
 
 import sys
 import os
+import mmap
+
+# 每批转换的字符数
+CHUNK_CHARS = 1024
 
 def calculate_font_size(width, height):
     """计算单个字符的字模大小（字节数）"""
     bytes_per_line = (width + 7) // 8
     return bytes_per_line * height
 
+def calculate_tiled_font_size(width, height):
+    """计算8x8分块格式下单个字符的字模大小（字节数）"""
+    return (width + 7) // 8 * ((height + 7) // 8) * 8
+
+# '0'/'1' 字符 -> 0/1 点阵值
+_BIT_VALUES = bytes.maketrans(b'01', b'\x00\x01')
+
+def unpack_bits(data):
+    """将字节数据一次性解包为 '0'/'1' 位串（高位在前）"""
+    if not data:
+        return ''
+    return bin(int.from_bytes(data, 'big'))[2:].zfill(len(data) * 8)
+
 def decode_vertical_pattern(data, width, height):
     """
     纵向取模解码：从上到下，从左到右
-    返回一个二维数组，[行][列] = 0或1
+    返回按行连续存放的点阵 bytearray，[行 * width + 列] = 0或1
+    """
+    # 复用批量转置得到横向取模数据，再按行解包
+    font_size = calculate_font_size(width, height)
+    char_data = bytes(data[:font_size]).ljust(font_size, b'\x00')
+    bits = unpack_bits(transpose_vertical_to_horizontal(char_data, width, height))
+    line_bits = (width + 7) // 8 * 8
+    
+    rows = ''.join(bits[row * line_bits:row * line_bits + width] for row in range(height))
+    return bytearray(rows.encode().translate(_BIT_VALUES))
+
+def transpose8(x, num_blocks=1):
+    """
+    8x8位矩阵转置（SWAR）
+    x 由 num_blocks 个连续的64位块组成，每块的第k个字节（高位在前）为矩阵第k行；
+    三轮掩码交换分别交换 1x1、2x2、4x4 子块，对所有块同时进行
+    """
+    m1 = int.from_bytes(b'\x00\xaa\x00\xaa\x00\xaa\x00\xaa' * num_blocks, 'big')
+    m2 = int.from_bytes(b'\x00\x00\xcc\xcc\x00\x00\xcc\xcc' * num_blocks, 'big')
+    m3 = int.from_bytes(b'\x00\x00\x00\x00\xf0\xf0\xf0\xf0' * num_blocks, 'big')
+    
+    t = (x ^ (x >> 7)) & m1
+    x = x ^ t ^ (t << 7)
+    t = (x ^ (x >> 14)) & m2
+    x = x ^ t ^ (t << 14)
+    t = (x ^ (x >> 28)) & m3
+    x = x ^ t ^ (t << 28)
+    return x
+
+def _transpose_row_blocks(data, width, height):
     """
+    按行块转置纵向取模数据
+    每8列x8行为一个8x8位块：纵向取模中块内8个字节是8列，转置后即为横向取模的8行。
+    同一行块的所有块用一次步长切片取出，一次 transpose8 完成转置
+    
+    Yields:
+        (行块序号, 转置后的数据)，数据按 (字符, 列块, 块内行) 排列
+    """
+    font_size = calculate_font_size(width, height)
+    num_chars = len(data) // font_size
+    bytes_per_line = (width + 7) // 8
     bytes_per_column = (height + 7) // 8
-    pattern = []
-    
-    for row in range(height):
-        line = []
-        for col in range(width):
-            # 计算字节索引：第col列的字节索引
-            col_byte_idx = col * bytes_per_column + (row // 8)
-            bit_in_byte = row % 8
-            
-            if col_byte_idx < len(data):
-                byte = data[col_byte_idx]
-                val = byte & (0x80 >> bit_in_byte)
-            else:
-                val = 0
-            line.append(1 if val else 0)
-        pattern.append(line)
+    column_size = width * bytes_per_column
+    padded_size = bytes_per_line * 8 * bytes_per_column
+    
+    # 宽度补齐到8的倍数列，超出字符数据的部分按0处理
+    if column_size == font_size == padded_size:
+        vertical_data = bytes(data[:num_chars * font_size])
+    else:
+        used_size = min(column_size, font_size)
+        vertical_data = b''.join(
+            data[offset:offset + used_size].ljust(padded_size, b'\x00')
+            for offset in range(0, num_chars * font_size, font_size))
+    
+    num_blocks = num_chars * bytes_per_line
     
-    return pattern
+    for row_block in range(bytes_per_column):
+        # 所有字符第row_block个行块的列字节, 按 (字符, 列块, 列) 排列
+        column_bytes = vertical_data[row_block::bytes_per_column]
+        blocks = transpose8(int.from_bytes(column_bytes, 'big'), num_blocks)
+        yield row_block, blocks.to_bytes(num_blocks * 8, 'big')
 
-def encode_horizontal_pattern(pattern, width, height):
+def transpose_vertical_to_horizontal(data, width, height):
     """
-    横向取模编码：从左到右，从上到下
-    输入：二维数组 [行][列]
-    输出：字节数组
+    批量将纵向取模数据转换为横向取模
+    
+    Args:
+        data: 纵向取模数据（连续的多个字符）
+        width: 字符宽度
+        height: 字符高度
+    
+    Returns:
+        横向取模数据
     """
+    font_size = calculate_font_size(width, height)
     bytes_per_line = (width + 7) // 8
-    result = bytearray()
+    result = bytearray(len(data) // font_size * font_size)
     
-    for row in range(height):
-        for col_byte in range(bytes_per_line):
-            byte_val = 0
-            for bit in range(8):
-                col = col_byte * 8 + bit
-                if col < width and pattern[row][col]:
-                    byte_val |= (0x80 >> bit)
-            result.append(byte_val)
+    for row_block, rows in _transpose_row_blocks(data, width, height):
+        # 转置后每块的8个字节为8行, 按步长写回各字符对应的行
+        for bit in range(8):
+            row = row_block * 8 + bit
+            if row >= height:
+                break
+            for col_byte in range(bytes_per_line):
+                result[row * bytes_per_line + col_byte::font_size] = \
+                    rows[col_byte * 8 + bit::bytes_per_line * 8]
+    
+    return bytes(result)
+
+def transpose_vertical_to_tiled(data, width, height):
+    """
+    批量将纵向取模数据转换为8x8分块格式
+    每个字符按 (行块, 列块) 顺序存放8x8位块，每块8个字节依次为块内8行（高位在左）。
+    第row行第col列的像素位于第 ((row >> 3) * 列块数 + (col >> 3)) 块的第 (row & 7) 字节，
+    读取时不需要再做转置
+    
+    Args:
+        data: 纵向取模数据（连续的多个字符）
+        width: 字符宽度
+        height: 字符高度
+    
+    Returns:
+        分块格式数据，每字符 calculate_tiled_font_size(width, height) 字节
+    """
+    font_size = calculate_font_size(width, height)
+    tiled_size = calculate_tiled_font_size(width, height)
+    line_size = (width + 7) // 8 * 8
+    result = bytearray(len(data) // font_size * tiled_size)
+    
+    for row_block, rows in _transpose_row_blocks(data, width, height):
+        # 转置结果已按块排列, 每个字符的一整行块连续写入
+        for offset in range(line_size):
+            result[row_block * line_size + offset::tiled_size] = rows[offset::line_size]
     
     return bytes(result)
 
@@ -68,7 +160,7 @@ def calculate_gb2312_offset(gb_bytes, font_size):
     offset = (94 * (qu - 1) + (wei - 1)) * font_size
     return offset
 
-def convert_font_file(input_file, output_file, width, height):
+def convert_font_file(input_file, output_file, width, height, tiled=False):
     """
     转换字库文件从纵向取模到横向取模
     
@@ -77,6 +169,7 @@ def convert_font_file(input_file, output_file, width, height):
         output_file: 输出文件路径（横向取模）
         width: 字符宽度
         height: 字符高度
+        tiled: 为True时输出8x8分块格式，见 transpose_vertical_to_tiled
     """
     if not os.path.exists(input_file):
         print(f"错误: 找不到输入文件: {input_file}")
@@ -102,34 +195,26 @@ def convert_font_file(input_file, output_file, width, height):
     if num_chars < 94 * 94:
         print(f"警告: 字符数量 ({num_chars}) 少于预期的 GB2312 字符数 (8836)")
     
-    # 打开文件
-    with open(input_file, 'rb') as fin, open(output_file, 'wb') as fout:
-        converted_count = 0
-        
-        # 逐字符处理
-        for char_idx in range(num_chars):
-            # 读取纵向取模数据
-            offset = char_idx * font_size
-            fin.seek(offset)
-            vertical_data = fin.read(font_size)
-            
-            if len(vertical_data) < font_size:
-                break
-            
-            # 解码为点阵模式
-            pattern = decode_vertical_pattern(vertical_data, width, height)
-            
-            # 编码为横向取模
-            horizontal_data = encode_horizontal_pattern(pattern, width, height)
-            
-            # 写入输出文件
-            fout.write(horizontal_data)
-            converted_count += 1
-            
-            # 显示进度
-            if (char_idx + 1) % 1000 == 0:
-                progress = (char_idx + 1) * 100 // num_chars
-                print(f"进度: {char_idx + 1}/{num_chars} ({progress}%)")
+    if tiled:
+        output_char_size = calculate_tiled_font_size(width, height)
+        transpose = transpose_vertical_to_tiled
+    else:
+        output_char_size = font_size
+        transpose = transpose_vertical_to_horizontal
+    
+    # 输入输出文件都做内存映射，分块转换后直接写入输出文件的映射
+    # 分块使每块的中间数据保持在缓存大小量级，不随字库大小增长
+    output_size = num_chars * output_char_size
+    with open(input_file, 'rb') as fin, open(output_file, 'w+b') as fout:
+        fout.truncate(output_size)
+        if output_size > 0:
+            with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as vertical_data, \
+                    mmap.mmap(fout.fileno(), output_size) as output_data:
+                for start in range(0, num_chars, CHUNK_CHARS):
+                    stop = min(start + CHUNK_CHARS, num_chars)
+                    output_data[start * output_char_size:stop * output_char_size] = transpose(
+                        vertical_data[start * font_size:stop * font_size], width, height)
+    converted_count = num_chars
     
     print(f"\n转换完成!")
     print(f"转换字符数: {converted_count}")
@@ -137,7 +222,7 @@ def convert_font_file(input_file, output_file, width, height):
     
     # 验证输出文件大小
     output_size = os.path.getsize(output_file)
-    expected_size = converted_count * font_size
+    expected_size = converted_count * output_char_size
     if output_size == expected_size:
         print(f"输出文件大小验证通过: {output_size} 字节")
     else:
@@ -154,6 +239,12 @@ def verify_conversion(input_file, output_file, width, height, test_chars="我"):
     
     font_size = calculate_font_size(width, height)
     
+    # 一次性读取原始数据和转换后数据，避免每个字符重新打开文件并 seek
+    with open(input_file, 'rb') as f:
+        original_all = f.read()
+    with open(output_file, 'rb') as f:
+        converted_all = f.read()
+    
     for char in test_chars:
         try:
             if ord(char) < 128:
@@ -165,18 +256,11 @@ def verify_conversion(input_file, output_file, width, height, test_chars="我"):
             continue
         
         offset = calculate_gb2312_offset(gb_bytes, font_size)
-        if offset is None:
+        if offset is None or offset < 0:
             continue
         
-        # 读取原始数据
-        with open(input_file, 'rb') as f:
-            f.seek(offset)
-            original_data = f.read(font_size)
-        
-        # 读取转换后数据
-        with open(output_file, 'rb') as f:
-            f.seek(offset)
-            converted_data = f.read(font_size)
+        original_data = original_all[offset:offset + font_size]
+        converted_data = converted_all[offset:offset + font_size]
         
         # 解码并显示
         pattern_original = decode_vertical_pattern(original_data, width, height)
@@ -184,7 +268,8 @@ def verify_conversion(input_file, output_file, width, height, test_chars="我"):
         
         print(f"\n字符: '{char}'")
         print("原始 (纵向解码):")
-        for i, row in enumerate(pattern_original):
+        for i in range(height):
+            row = pattern_original[i * width:(i + 1) * width]
             line = "".join("██" if bit else "[]" for bit in row[:16])
             print(f"  {i:2d}: {line}")
         
@@ -208,36 +293,47 @@ def verify_conversion(input_file, output_file, width, height, test_chars="我"):
 
 def main():
     """主函数"""
-    if len(sys.argv) < 4:
+    # --tiled: 输出8x8分块格式
+    tiled = "--tiled" in sys.argv
+    args = [arg for arg in sys.argv if arg != "--tiled"]
+    
+    if len(args) < 4:
         print("用法:")
-        print("  单个文件: convert_vertical_to_horizontal.py <输入文件> <输出文件> <宽度> <高度> [验证字符]")
+        print("  单个文件: convert_vertical_to_horizontal.py <输入文件> <输出文件> <宽度> <高度> [验证字符] [--tiled]")
         print("  批量转换: convert_vertical_to_horizontal.py --batch")
         print("\n示例:")
         print("  python3 convert_vertical_to_horizontal.py fonts/HZK16_1 fonts/HZK16_converted 16 16")
         print("  python3 convert_vertical_to_horizontal.py fonts/HZK24 fonts/HZK24_converted 24 24 '我'")
+        print("  python3 convert_vertical_to_horizontal.py fonts/HZK16_1 fonts/HZK16_tiled 16 16 --tiled")
         print("\n批量转换预设:")
         print("  - HZK16_1 (16x16) -> HZK16_converted")
         print("  - HZK24 (24x24) -> HZK24_converted (如果存在)")
         sys.exit(1)
     
     # 批量转换模式
-    if len(sys.argv) == 2 and sys.argv[1] == "--batch":
+    if len(args) == 2 and args[1] == "--batch":
         batch_convert()
         return
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
-    width = int(sys.argv[3])
-    height = int(sys.argv[4])
-    verify_chars = sys.argv[5] if len(sys.argv) > 5 else "我"
+    input_file = args[1]
+    output_file = args[2]
+    width = int(args[3])
+    height = int(args[4])
+    verify_chars = args[5] if len(args) > 5 else "我"
     
     print(f"输入文件: {input_file}")
     print(f"输出文件: {output_file}")
     print(f"字符尺寸: {width}x{height}")
+    if tiled:
+        print("输出格式: 8x8分块")
     print("-" * 60)
     
     # 执行转换
-    if convert_font_file(input_file, output_file, width, height):
+    if convert_font_file(input_file, output_file, width, height, tiled):
+        if tiled:
+            # 验证显示按横向取模解码, 不适用于分块格式
+            print("\n转换完成 (分块格式不做验证显示)")
+            return
         # 验证转换结果
         verify_conversion(input_file, output_file, width, height, verify_chars)
         print("\n转换和验证完成!")
@@ -3,9 +3,9 @@
 Simple HTTP server to serve files from current directory
 """
 import http.server
-import socketserver
 import os
 import sys
+from functools import partial
 
 PORT = 8000
 ADDRESS = "0.0.0.0"
@@ -23,14 +23,16 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         super().end_headers()
 
 def main():
-    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    directory = os.path.dirname(os.path.abspath(__file__))
     
-    Handler = MyHTTPRequestHandler
+    # Serve the script directory without changing the working directory
+    Handler = partial(MyHTTPRequestHandler, directory=directory)
     
-    with socketserver.TCPServer((ADDRESS, PORT), Handler) as httpd:
+    # Handle each request in its own (daemon) thread so font files load in parallel
+    with http.server.ThreadingHTTPServer((ADDRESS, PORT), Handler) as httpd:
         address = f"http://{ADDRESS}:{PORT}"
         print(f"Server started at {address}")
-        print(f"Serving directory: {os.getcwd()}")
+        print(f"Serving directory: {directory}")
         print("Press Ctrl+C to stop the server")
         try:
             httpd.serve_forever()
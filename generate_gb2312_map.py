@@ -6,9 +6,16 @@
 输出为JSON格式，供JavaScript使用
 """
 
+import codecs
 import json
 import sys
 
+def _replace_gb2312_cell(error):
+    """解码错误处理: 整个双字节区位替换为一个U+FFFD, 保证后续字符与区位对齐"""
+    return ('\ufffd', error.start - error.start % 2 + 2)
+
+codecs.register_error('gb2312_cell', _replace_gb2312_cell)
+
 def generate_gb2312_unicode_map():
     """生成GB2312编码到Unicode的映射表"""
     mapping = {}
@@ -17,26 +24,21 @@ def generate_gb2312_unicode_map():
     # 区码范围: 1-94 (对应字节 0xA1-0xFE)
     # 位码范围: 1-94 (对应字节 0xA1-0xFE)
     
-    for qu in range(1, 95):  # 区码 1-94
-        for wei in range(1, 95):  # 位码 1-94
-            try:
-                # GB2312字节编码
-                gb_byte1 = 0xA0 + qu
-                gb_byte2 = 0xA0 + wei
-                gb_bytes = bytes([gb_byte1, gb_byte2])
-                
-                # 转换为Unicode
-                try:
-                    unicode_char = gb_bytes.decode('gb2312')
-                    if unicode_char:
-                        unicode_code = ord(unicode_char)
-                        # 存储: Unicode码点 -> GB2312字节
-                        mapping[unicode_code] = [gb_byte1, gb_byte2]
-                except UnicodeDecodeError:
-                    # 某些区位码没有对应的字符
-                    pass
-            except Exception as e:
-                pass
+    # 将全部区位编码拼接后一次性解码, 解码结果的第i个字符对应第i个区位
+    buf = bytes(b for qu in range(1, 95) for wei in range(1, 95)
+                for b in (0xA0 + qu, 0xA0 + wei))
+    text = codecs.decode(buf, 'gb2312', errors='gb2312_cell')
+    
+    for index, unicode_char in enumerate(text):
+        # 某些区位码没有对应的字符
+        if unicode_char == '\ufffd':
+            continue
+        
+        qu, wei = divmod(index, 94)
+        gb_byte1 = 0xA1 + qu
+        gb_byte2 = 0xA1 + wei
+        # 存储: Unicode码点 -> GB2312字节
+        mapping[ord(unicode_char)] = [gb_byte1, gb_byte2]
     
     return mapping
 
@@ -3,6 +3,8 @@
 
 import sys
 import os
+import mmap
+from generate_gb2312_map import generate_gb2312_unicode_map
 
 class FontFile:
     """字模数据类"""
@@ -25,6 +27,13 @@ class FontFile:
         'bg_white': '\033[47m',
     }
 
+    # 字节 -> C语言十六进制字面量
+    _HEX_TABLE = [f"0x{b:02X}" for b in range(256)]
+
+    # 字节 -> 8个像素的显示字符串, ██ 表示点, [] 表示空白
+    _PIXEL_TABLE = ["".join("██" if (b >> (7 - k)) & 1 else "[]" for k in range(8))
+                    for b in range(256)]
+
     def __init__(self, charset, width, height, file_path):
         self.charset = charset
         self.width = width
@@ -33,6 +42,10 @@ class FontFile:
         # 字模数据大小, 宽度每8位一字节, 不足8位也占一字节
         self.bytes_per_line = (width + 7) // 8
         self.font_code_size = self.bytes_per_line * height
+        # 字库文件内存映射, 首次读取时建立
+        self._mmap = None
+        # UNICODE码点 -> (GB2312编码, 字库偏移量), 首次查询时建立
+        self._offset_table = None
 
     def get_font_data(self, char):
         """获取字模数据"""
@@ -43,19 +56,26 @@ class FontFile:
         else:
             raise ValueError(f"不支持的字符集: {self.charset}")
 
-    def _read_font_data(self, offset):
-        """从字库文件中读取字模数据"""
-        try:
+    def _get_mmap(self):
+        """获取字库文件的内存映射"""
+        if self._mmap is None:
             with open(self.file_path, 'rb') as f:
-                f.seek(offset)
-                font_data = f.read(self.font_code_size)
-                return font_data
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def _read_font_data(self, offset, log=print):
+        """从字库文件中读取字模数据, 错误信息交给 log 输出"""
+        try:
+            font_map = self._get_mmap()
+            if offset < 0 or offset + self.font_code_size > len(font_map):
+                raise ValueError(f"偏移量 {offset} 超出字库文件范围")
+            return font_map[offset:offset + self.font_code_size]
         except Exception as e:
-            print(f"读取字模数据失败: {e}")
+            log(f"读取字模数据失败: {e}")
             return None
 
-    def _get_gb2312_bytes(self, char):
-        """获取GB2312编码字节"""
+    def _get_gb2312_bytes(self, char, log=print):
+        """获取GB2312编码字节, 警告信息交给 log 输出"""
         try:
             if ord(char) < 128:  # ASCII字符
                 # ASCII字符在GB2312中的位置是 0xA1 + ASCII码
@@ -64,7 +84,7 @@ class FontFile:
             else:  # 汉字
                 return char.encode('gb2312')
         except UnicodeEncodeError:
-            print(f"警告: 字符 '{char}' 无法用GB2312编码")
+            log(f"警告: 字符 '{char}' 无法用GB2312编码")
             return None
 
     def _calculate_gb2312_offset(self, gb_bytes):
@@ -89,105 +109,134 @@ class FontFile:
         
         return offset
 
+    def _get_offset_table(self):
+        """获取UNICODE码点到 (GB2312编码, 字库偏移量) 的映射表"""
+        if self._offset_table is None:
+            table = {}
+            for code, gb_pair in generate_gb2312_unicode_map().items():
+                gb_bytes = bytes(gb_pair)
+                table[code] = (gb_bytes, self._calculate_gb2312_offset(gb_bytes))
+
+            # ASCII字符映射到全角字符所在的区位, 与 _get_gb2312_bytes 一致
+            for code in range(35, 128):
+                gb_bytes = bytes([0xA3, 0xA3 + code - 35])
+                table[code] = (gb_bytes, self._calculate_gb2312_offset(gb_bytes))
+            self._offset_table = table
+        return self._offset_table
+
+    def _lookup_char(self, char, log=print):
+        """查表获取字符的GB2312编码和字库偏移量, 失败时返回 (None, None)"""
+        entry = self._get_offset_table().get(ord(char))
+        if entry is not None:
+            return entry
+        # 表中没有的字符按原方式编码, 以便输出警告
+        gb_bytes = self._get_gb2312_bytes(char, log)
+        if gb_bytes is None:
+            return None, None
+        return gb_bytes, self._calculate_gb2312_offset(gb_bytes)
+
     def get_ascii_font_data(self, char):
         """获取ASCII字模数据"""
         return None
 
     def get_gb2312_font_data(self, char):
         """获取GB2312字模数据"""
-        gb_bytes = self._get_gb2312_bytes(char)
-        if gb_bytes is None:
-            return None
-        offset = self._calculate_gb2312_offset(gb_bytes)
+        _, offset = self._lookup_char(char)
         if offset is None:
             return None
         return self._read_font_data(offset)
     
     def print_font_array(self, font_data):
         """打印字模数据"""
-        print(f"const uint8_t font_data[{self.font_code_size}] = {{")
+        print("\n".join(self._font_array_lines(font_data)))
+
+    def _font_array_lines(self, font_data):
+        """生成字模数据的C数组各行"""
+        lines = [f"const uint8_t font_data[{self.font_code_size}] = {{"]
+        # memoryview 切片不复制数据
+        view = memoryview(font_data)
         for i in range(0, self.font_code_size, 8):
-            hex_str = ", ".join(f"0x{b:02X}" for b in font_data[i:i+8])
-            print(f"    {hex_str}" + ("," if i < self.font_code_size - 8 else ""))
-        print("};")
-
-    def _print_horizontal_scale(self):
-        """打印水平坐标"""
-        # 打印列号 (十位数)
-        print("     ", end="")
-        for i in range(self.width):
-            print(f"{i//10 if i >= 10 else ' '} ", end="")
-        print()
-        # 打印列号 (个位数)
-        print("     ", end="")
-        for i in range(self.width):
-            print(f"{i%10} ", end="")
-        print()
-        # 打印分隔线
-        print("    +" + "-" * (self.width * 2 + 1) + "+")
+            hex_str = ", ".join(map(self._HEX_TABLE.__getitem__, view[i:i+8]))
+            lines.append(f"    {hex_str}" + ("," if i < self.font_code_size - 8 else ""))
+        lines.append("};")
+        return lines
+
+    def _horizontal_scale_lines(self):
+        """生成水平坐标的各行"""
+        return [
+            # 列号 (十位数)
+            "     " + "".join(f"{i//10 if i >= 10 else ' '} " for i in range(self.width)),
+            # 列号 (个位数)
+            "     " + "".join(f"{i%10} " for i in range(self.width)),
+            # 分隔线
+            "    +" + "-" * (self.width * 2 + 1) + "+",
+        ]
 
     def print_font_pattern(self, font_data):
         """打印点阵显示（带网格和坐标）"""
-        # 打印水平坐标
-        self._print_horizontal_scale()
+        print("\n".join(self._font_pattern_lines(font_data)))
 
-        # 打印每一行
+    def _font_pattern_lines(self, font_data):
+        """生成点阵显示的各行"""
+        # 水平坐标
+        lines = self._horizontal_scale_lines()
+
+        # 每一行
         for row in range(self.height):
-            # 打印行号
-            print(f"{row:3d} |", end=" ")
-            
-            # 打印该行的点阵数据
-            for col_byte in range(self.bytes_per_line):
-                byte = font_data[row * self.bytes_per_line + col_byte]
-                # 对于每个字节中的每一位
-                for bit in range(8):
-                    # 如果已经超出字体宽度，跳过剩余位
-                    if col_byte * 8 + bit >= self.width:
-                        break
-                    # 使用不同的字符显示点和空白
-                    if byte & (0x80 >> bit):
-                        print("██", end="")
-                    else:
-                        print("[]", end="")
-            print(" |")  # 行尾边框
-
-        # 打印底部分隔线
-        print("    +" + "-" * (self.width * 2 + 1) + "+")
-
-        # 打印图例
-        print("\n图例:")
-        print("██ 表示点阵中的点")
-        print("[] 表示空白位置")
-        print("坐标格式: [行号, 列号], 从0开始计数")
+            # 该行的点阵数据, 超出字体宽度的位截掉
+            start = row * self.bytes_per_line
+            row_bytes = font_data[start:start + self.bytes_per_line]
+            line = "".join(map(self._PIXEL_TABLE.__getitem__, row_bytes))[:self.width * 2]
+            # 行号 + 点阵 + 行尾边框
+            lines.append(f"{row:3d} | {line} |")
+
+        # 底部分隔线
+        lines.append("    +" + "-" * (self.width * 2 + 1) + "+")
+
+        # 图例
+        lines.append("\n图例:")
+        lines.append("██ 表示点阵中的点")
+        lines.append("[] 表示空白位置")
+        lines.append("坐标格式: [行号, 列号], 从0开始计数")
+        return lines
 
     def dump_char(self, char):
         """打印字符的点阵数据"""
-        print(f"\n字符: '{char}' (UNICODE: {ord(char)} / 0x{ord(char):04X})")
+        # 各行(包括过程中的警告信息)先收集到 buf, 最后一次性写到标准输出
+        buf = []
+        try:
+            self._dump_char_lines(char, buf)
+        finally:
+            if buf:
+                sys.stdout.write("\n".join(buf) + "\n")
+
+    def _dump_char_lines(self, char, buf):
+        """将字符信息、字模数据和点阵显示的各行追加到 buf"""
+        buf.append(f"\n字符: '{char}' (UNICODE: {ord(char)} / 0x{ord(char):04X})")
 
         if self.charset != self.CHARSET_GB2312:
             return
 
-        gb_bytes = self._get_gb2312_bytes(char)
+        gb_bytes, offset = self._lookup_char(char, log=buf.append)
         if gb_bytes is None:
             return
         
-        print(f"GB2312编码: {' '.join(f'0x{b:02X}' for b in gb_bytes)}")
+        buf.append(f"GB2312编码: {' '.join(map(self._HEX_TABLE.__getitem__, gb_bytes))}")
 
-        offset = self._calculate_gb2312_offset(gb_bytes)
         if offset is None:
             return
         
-        print(f"字库偏移: {offset} (0x{offset:X})")
+        buf.append(f"字库偏移: {offset} (0x{offset:X})")
 
-        font_data = self._read_font_data(offset)
+        font_data = self._read_font_data(offset, log=buf.append)
         if font_data is None:
             return
 
-        print("\n字模数据:")
-        self.print_font_array(font_data)
+        buf.append("\n字模数据:")
+        buf.extend(self._font_array_lines(font_data))
 
-        print("\n点阵显示:")
-        self.print_font_pattern(font_data)
+        buf.append("\n点阵显示:")
+        buf.extend(self._font_pattern_lines(font_data))
 
     def dump_text(self, text):
         """打印文本的点阵数据"""
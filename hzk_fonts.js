@@ -5,16 +5,31 @@
 
 // 汉字字库类
 class HZKFont {
-    constructor(name, width, height, filePath) {
+    /**
+     * 创建汉字字库
+     * @param {string} name - 字库名称
+     * @param {number} width - 字符宽度
+     * @param {number} height - 字符高度
+     * @param {string} filePath - 字库文件路径
+     * @param {string} layout - 字模格式: 'horizontal' 横向取模, 'tiled' 8x8分块
+     *                          (由 convert_vertical_to_horizontal.py --tiled 生成)
+     */
+    constructor(name, width, height, filePath, layout = 'horizontal') {
         this.name = name;
         this.width = width;
         this.height = height;
         this.filePath = filePath;
+        this.layout = layout;
         this.charset = 'gb2312';
         
         // 计算字模数据大小
         this.bytesPerLine = Math.ceil(width / 8);
-        this.bytesPerChar = this.bytesPerLine * height;
+        if (layout === 'tiled') {
+            // 每个8x8块占8字节, 不足8行的行块也按8行存放
+            this.bytesPerChar = this.bytesPerLine * Math.ceil(height / 8) * 8;
+        } else {
+            this.bytesPerChar = this.bytesPerLine * height;
+        }
         
         // 字库数据缓存
         this.fontData = null;
@@ -111,6 +126,32 @@ class HZKFont {
         return charData;
     }
 
+    /**
+     * 获取字模中指定位置的像素值
+     * @param {Uint8Array} charData - 字模数据
+     * @param {number} row - 行
+     * @param {number} col - 列
+     * @returns {number} - 0或1
+     */
+    getPixel(charData, row, col) {
+        let byteIndex;
+        let bitPosition;
+        if (this.layout === 'tiled') {
+            // 第 (row>>3, col>>3) 个8x8块的第 (row&7) 字节
+            byteIndex = ((row >> 3) * this.bytesPerLine + (col >> 3)) * 8 + (row & 7);
+            bitPosition = 7 - (col & 7);
+        } else {
+            // 计算当前像素位于哪个字节
+            byteIndex = row * this.bytesPerLine + Math.floor(col / 8);
+            // 计算当前像素在字节中的位置（从MSB开始）
+            bitPosition = 7 - (col % 8);
+        }
+
+        // 从对应字节中提取位值
+        const byte = charData[byteIndex] || 0;
+        return (byte >> bitPosition) & 0x01;
+    }
+
     /**
      * 将字符绘制到位图
      * @param {Array} bitmap - 位图数组
@@ -131,17 +172,8 @@ class HZKFont {
 
         // 绘制字符
         for (let row = 0; row < this.height; row++) {
-            const rowStartIndex = row * this.bytesPerLine;
-            
             for (let col = 0; col < this.width; col++) {
-                // 计算当前像素位于哪个字节
-                const byteIndex = rowStartIndex + Math.floor(col / 8);
-                // 计算当前像素在字节中的位置（从MSB开始）
-                const bitPosition = 7 - (col % 8);
-                
-                // 从对应字节中提取位值
-                const byte = charData[byteIndex] || 0;
-                const bit = (byte >> bitPosition) & 0x01;
+                const bit = this.getPixel(charData, row, col);
                 
                 // 设置位图像素
                 const targetX = x + col;
@@ -166,8 +198,8 @@ class HZKFontManager {
     /**
      * 注册字库
      */
-    registerFont(name, width, height, filePath) {
-        const font = new HZKFont(name, width, height, filePath);
+    registerFont(name, width, height, filePath, layout = 'horizontal') {
+        const font = new HZKFont(name, width, height, filePath, layout);
         this.fonts[name] = font;
         return font;
     }